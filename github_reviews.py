@@ -5,13 +5,30 @@ Collects repository feedback including stars, issues, discussions, and PR commen
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util import make_headers
 import json
 import argparse
-from datetime import datetime
+from datetime import datetime, timedelta
 import time
-from typing import List, Dict, Optional
+import os
+import threading
+from typing import Any, Iterator, List, Dict, Optional, Tuple
 import logging
-from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse, parse_qs, urlencode
+from dataclasses import dataclass, asdict
+from operator import itemgetter
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    from requests_cache import CachedSession
+except ImportError:
+    CachedSession = None
 
 # Configure logging
 logging.basicConfig(
@@ -20,7 +37,63 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-@dataclass
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "gh_review_scraper")
+# Cached responses older than this are dropped so the cache can't grow forever
+CACHE_MAX_AGE = timedelta(days=7)
+MAX_RETRIES = 3
+
+# Only the fields GitHubReview needs; newest first so the loop can stop at start_date
+DISCUSSIONS_QUERY = """
+query($owner: String!, $repo: String!, $cursor: String) {
+  repository(owner: $owner, name: $repo) {
+    discussions(first: 100, after: $cursor, orderBy: {field: CREATED_AT, direction: DESC}) {
+      pageInfo { hasNextPage endCursor }
+      nodes {
+        title body url createdAt closed
+        author { login }
+        labels(first: 20) { nodes { name } }
+        reactionGroups { content reactors { totalCount } }
+      }
+    }
+  }
+}
+"""
+
+# GraphQL reaction names mapped to the REST reaction keys
+_REACTION_KEYS = {
+    "THUMBS_UP": "+1",
+    "THUMBS_DOWN": "-1",
+    "LAUGH": "laugh",
+    "HOORAY": "hooray",
+    "CONFUSED": "confused",
+    "HEART": "heart",
+    "ROCKET": "rocket",
+    "EYES": "eyes",
+}
+
+# Fields read from each issue, fetched in a single C-level call per item;
+# reactions stays out because it may be missing and needs a .get default
+_issue_fields = itemgetter("title", "body", "user", "created_at", "html_url", "state", "labels")
+_name = itemgetter("name")
+
+def _loads(content: bytes):
+    """Decode a JSON response body, using orjson when available"""
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+def _bounds(start_date: str, end_date: str) -> Tuple[str, str]:
+    """Widen YYYY-MM-DD bounds to ISO timestamps comparable with GitHub's created_at"""
+    return f"{start_date}T00:00:00Z", f"{end_date}T23:59:59Z"
+
+def _last_page(links: Dict[str, Dict[str, str]]) -> int:
+    """Read the last page number from parsed Link relations (1 if absent)"""
+    last_url = links.get("last", {}).get("url")
+    if not last_url:
+        return 1
+    return int(parse_qs(urlparse(last_url).query).get("page", ["1"])[0])
+
+@dataclass(slots=True)
 class GitHubReview:
     """Data class to represent a GitHub feedback item"""
     title: str
@@ -34,128 +107,263 @@ class GitHubReview:
     reactions: Dict[str, int] = None
     rating: Optional[float] = None
 
+def _dumps_line(review: GitHubReview) -> bytes:
+    """Serialize a review as a single JSON Lines record"""
+    if orjson is not None:
+        return orjson.dumps(review) + b"\n"
+    return json.dumps(asdict(review)).encode() + b"\n"
+
+def _build_issue(issue: Dict) -> GitHubReview:
+    """Build a GitHubReview from a REST issue object"""
+    title, body, user, created_at, html_url, state, labels = _issue_fields(issue)
+    reactions = issue.get("reactions", {})
+    
+    # Calculate rating based on reactions
+    count = reactions.get
+    total_reactions = count("total_count", 0)
+    positive = count("+1", 0) + count("heart", 0) + count("hooray", 0)
+    rating = (positive / total_reactions * 5) if total_reactions > 0 else None
+    
+    return GitHubReview(
+        title=title,
+        body=body or "",
+        author=user["login"],
+        date=created_at[:10],  # YYYY-MM-DD
+        type="issue",
+        url=html_url,
+        state=state,
+        labels=list(map(_name, labels)),
+        reactions=reactions,
+        rating=rating
+    )
+
 class GitHubScraper:
     """Scraper for GitHub repository feedback"""
     
-    def __init__(self, token: Optional[str] = None):
-        """Initialize with optional GitHub token"""
+    def __init__(self, token: Optional[str] = None, max_workers: int = 10,
+                 cache_dir: Optional[str] = CACHE_DIR):
+        """Initialize with optional GitHub token and HTTP cache directory"""
         self.base_url = "https://api.github.com"
-        self.session = requests.Session()
+        self.max_workers = max_workers
+        self.cache_dir = cache_dir
+        if cache_dir and CachedSession is not None:
+            # requests-cache honours Cache-Control and revalidates with ETags itself
+            os.makedirs(cache_dir, exist_ok=True)
+            self.session = CachedSession(
+                os.path.join(cache_dir, "http_cache.sqlite"),
+                backend="sqlite",
+                cache_control=True,
+                expire_after=3600,
+            )
+            self.session.cache.delete(older_than=CACHE_MAX_AGE)
+        else:
+            self.session = requests.Session()
+        # Earliest time the next request may start once the rate-limit budget runs low,
+        # shared by every worker so they pace against one budget together
+        self._next_request = 0.0
+        self._pace_lock = threading.Lock()
         if token:
             self.session.headers["Authorization"] = f"token {token}"
         self.session.headers["Accept"] = "application/vnd.github.v3+json"
         self.session.headers["User-Agent"] = "GitHubReviewScraper/1.0"
+        # Only advertise encodings urllib3 can decode here (br/zstd need optional packages)
+        self.session.headers.update(make_headers(accept_encoding=True))
+        
+        # Keep-alive pool sized for concurrent page fetches
+        adapter = HTTPAdapter(pool_connections=20, pool_maxsize=20)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
     
     def get_repo_info(self, owner: str, repo: str) -> Dict:
         """Get basic repository information"""
         url = f"{self.base_url}/repos/{owner}/{repo}"
         response = self.session.get(url)
         response.raise_for_status()
-        return response.json()
+        return _loads(response.content)
     
-    def get_issues(self, owner: str, repo: str, start_date: str, end_date: str) -> List[GitHubReview]:
+    def _throttle(self, response: requests.Response, can_retry: bool = True) -> bool:
+        """Back off based on rate-limit headers; return True if the request should be retried"""
+        headers = response.headers
+        if response.status_code in (403, 429):
+            if "Retry-After" in headers:
+                delay = int(headers["Retry-After"])
+            elif headers.get("X-RateLimit-Remaining") == "0":
+                delay = max(0, int(headers.get("X-RateLimit-Reset", 0)) - time.time())
+            else:
+                return False  # Not a rate limit (e.g. missing permissions)
+            if not can_retry:
+                return False  # Out of attempts; waiting would only delay the error
+            logger.warning(f"Rate limited, retrying in {delay:.0f}s")
+            time.sleep(delay)
+            return True
+        
+        remaining = headers.get("X-RateLimit-Remaining")
+        if remaining is not None and int(remaining) < 50:
+            # Spread the remaining budget over the time left in the window; each
+            # request reserves the next shared slot, so concurrent workers don't
+            # each spend the budget at the full rate
+            reset = int(headers.get("X-RateLimit-Reset", 0))
+            now = time.time()
+            interval = max(0, (reset - now) / max(int(remaining), 1))
+            with self._pace_lock:
+                slot = max(now, self._next_request)
+                self._next_request = slot + interval
+            time.sleep(slot - now)
+        return False
+    
+    def _request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Send a request, retrying (up to MAX_RETRIES attempts) while rate limited"""
+        for attempt in range(1, MAX_RETRIES + 1):
+            response = self.session.request(method, url, **kwargs)
+            if not self._throttle(response, can_retry=attempt < MAX_RETRIES):
+                break
+        return response
+    
+    def _get_page(self, url: str, params: Optional[Dict] = None) -> Tuple[Any, Dict[str, Dict[str, str]]]:
+        """Fetch a single page of a paginated endpoint; returns its Link relations"""
+        response = self._request("GET", url, params=params)
+        response.raise_for_status()
+        return _loads(response.content), response.links
+    
+    def _fetch_pages(self, url: str, params: Dict) -> Iterator[List[Dict]]:
+        """Yield pages in order, fetching up to max_workers pages concurrently"""
+        # Encode the fixed query once; only the page number changes per request
+        page_url = f"{url}?{urlencode(params)}&page="
+        data, links = self._get_page(f"{page_url}1")
+        yield data
+        
+        last_page = _last_page(links)
+        if last_page <= 1:
+            # Some endpoints omit rel="last"; follow rel="next" until it disappears
+            next_url = links.get("next", {}).get("url")
+            while next_url:
+                data, links = self._get_page(next_url)
+                yield data
+                next_url = links.get("next", {}).get("url")
+            return
+        
+        def fetch(page: int) -> List[Dict]:
+            return self._get_page(f"{page_url}{page}")[0]
+        
+        # Fetch in batches so callers that stop early don't burn the whole budget
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for start in range(2, last_page + 1, self.max_workers):
+                batch = range(start, min(start + self.max_workers, last_page + 1))
+                yield from executor.map(fetch, batch)
+    
+    def get_issues(self, owner: str, repo: str, start_date: str, end_date: str) -> Iterator[GitHubReview]:
         """Get repository issues within date range"""
-        reviews = []
-        page = 1
+        url = f"{self.base_url}/repos/{owner}/{repo}/issues"
+        start, end = _bounds(start_date, end_date)
+        params = {
+            "state": "all",
+            "sort": "created",
+            "direction": "asc",
+            "since": start,
+            "per_page": 100
+        }
         
+        build = _build_issue
+        for issues in self._fetch_pages(url, params):
+            for issue in issues:
+                created_at = issue["created_at"]
+                if created_at > end:
+                    return
+                # `since` filters on updated_at, so older issues updated later still show up
+                if created_at >= start:
+                    yield build(issue)
+    
+    def _graphql_pages(self, query: str, variables: Dict, path: str) -> Iterator[List[Dict]]:
+        """Yield node pages of a cursor-paginated GraphQL connection"""
+        url = f"{self.base_url}/graphql"
+        cursor = None
         while True:
-            url = f"{self.base_url}/repos/{owner}/{repo}/issues"
-            params = {
-                "state": "all",
-                "sort": "created",
-                "direction": "desc",
-                "per_page": 100,
-                "page": page
-            }
-            
-            response = self.session.get(url, params=params)
+            response = self._request("POST", url, json={"query": query, "variables": {**variables, "cursor": cursor}})
             response.raise_for_status()
-            issues = response.json()
+            payload = _loads(response.content)
+            if payload.get("errors"):
+                raise requests.exceptions.RequestException(payload["errors"][0].get("message"))
             
-            if not issues:
-                break
-                
-            for issue in issues:
-                created_at = issue["created_at"][:10]  # YYYY-MM-DD
-                if created_at < start_date:
-                    return reviews
-                if created_at <= end_date:
-                    # Calculate rating based on reactions
-                    reactions = issue.get("reactions", {})
-                    total_reactions = sum(reactions.values())
-                    positive = reactions.get("+1", 0) + reactions.get("heart", 0) + reactions.get("hooray", 0)
-                    rating = (positive / total_reactions * 5) if total_reactions > 0 else None
-                    
-                    review = GitHubReview(
-                        title=issue["title"],
-                        body=issue["body"] or "",
-                        author=issue["user"]["login"],
-                        date=created_at,
-                        type="issue",
-                        url=issue["html_url"],
-                        state=issue["state"],
-                        labels=[label["name"] for label in issue["labels"]],
-                        reactions=reactions,
-                        rating=rating
-                    )
-                    reviews.append(review)
+            connection = payload["data"]
+            for key in path.split("."):
+                connection = connection[key]
+            yield connection["nodes"]
             
-            page += 1
-            time.sleep(1)  # Rate limiting
-        
-        return reviews
+            page_info = connection["pageInfo"]
+            if not page_info["hasNextPage"]:
+                break
+            cursor = page_info["endCursor"]
     
-    def get_discussions(self, owner: str, repo: str, start_date: str, end_date: str) -> List[GitHubReview]:
+    def get_discussions(self, owner: str, repo: str, start_date: str, end_date: str) -> Iterator[GitHubReview]:
         """Get repository discussions within date range"""
-        reviews = []
-        
-        # Note: Discussions API requires GraphQL
-        # For simplicity, we'll skip this for now
-        # TODO: Implement GraphQL query for discussions
+        # Discussions are only exposed through GraphQL, which requires a token
+        if "Authorization" not in self.session.headers:
+            logger.warning("Skipping discussions: the GraphQL API requires a token")
+            return
         
-        return reviews
+        start, end = _bounds(start_date, end_date)
+        variables = {"owner": owner, "repo": repo}
+        try:
+            for discussions in self._graphql_pages(DISCUSSIONS_QUERY, variables, "repository.discussions"):
+                for discussion in discussions:
+                    created_at = discussion["createdAt"]
+                    if created_at < start:
+                        return
+                    if created_at <= end:
+                        # Same reaction keys and rating as REST issues
+                        reactions = {
+                            _REACTION_KEYS[group["content"]]: group["reactors"]["totalCount"]
+                            for group in discussion["reactionGroups"]
+                        }
+                        total_reactions = sum(reactions.values())
+                        reactions["total_count"] = total_reactions
+                        positive = reactions.get("+1", 0) + reactions.get("heart", 0) + reactions.get("hooray", 0)
+                        rating = (positive / total_reactions * 5) if total_reactions > 0 else None
+                        
+                        review = GitHubReview(
+                            title=discussion["title"],
+                            body=discussion["body"] or "",
+                            author=(discussion["author"] or {}).get("login", "ghost"),
+                            date=created_at[:10],  # YYYY-MM-DD
+                            type="discussion",
+                            url=discussion["url"],
+                            state="closed" if discussion["closed"] else "open",
+                            labels=list(map(_name, discussion["labels"]["nodes"])),
+                            reactions=reactions,
+                            rating=rating
+                        )
+                        yield review
+        except requests.RequestException as e:
+            # Discussions are optional; e.g. fine-grained tokens may lack the permission
+            logger.warning(f"Skipping discussions: {e}")
     
-    def get_pr_comments(self, owner: str, repo: str, start_date: str, end_date: str) -> List[GitHubReview]:
+    def get_pr_comments(self, owner: str, repo: str, start_date: str, end_date: str) -> Iterator[GitHubReview]:
         """Get pull request comments within date range"""
-        reviews = []
-        page = 1
+        url = f"{self.base_url}/repos/{owner}/{repo}/pulls/comments"
+        start, end = _bounds(start_date, end_date)
+        params = {
+            "sort": "created",
+            "direction": "desc",
+            "per_page": 100
+        }
         
-        while True:
-            url = f"{self.base_url}/repos/{owner}/{repo}/pulls/comments"
-            params = {
-                "sort": "created",
-                "direction": "desc",
-                "per_page": 100,
-                "page": page
-            }
-            
-            response = self.session.get(url, params=params)
-            response.raise_for_status()
-            comments = response.json()
-            
-            if not comments:
-                break
-                
+        Review = GitHubReview
+        for comments in self._fetch_pages(url, params):
             for comment in comments:
-                created_at = comment["created_at"][:10]  # YYYY-MM-DD
-                if created_at < start_date:
-                    return reviews
-                if created_at <= end_date:
-                    review = GitHubReview(
+                created_at = comment["created_at"]
+                if created_at < start:
+                    return
+                if created_at <= end:
+                    review = Review(
                         title=f"PR Comment on {comment['pull_request_url'].split('/')[-1]}",
                         body=comment["body"],
                         author=comment["user"]["login"],
-                        date=created_at,
+                        date=created_at[:10],  # YYYY-MM-DD
                         type="pr_comment",
                         url=comment["html_url"],
                         reactions=comment.get("reactions", {}),
                     )
-                    reviews.append(review)
-            
-            page += 1
-            time.sleep(1)  # Rate limiting
-        
-        return reviews
+                    yield review
 
 def main():
     parser = argparse.ArgumentParser(description="Scrape GitHub repository feedback")
@@ -163,7 +371,7 @@ def main():
     parser.add_argument("--start-date", required=True, help="Start date (YYYY-MM-DD)")
     parser.add_argument("--end-date", required=True, help="End date (YYYY-MM-DD)")
     parser.add_argument("--token", help="GitHub API token")
-    parser.add_argument("--output", default="github_reviews.json", help="Output JSON file")
+    parser.add_argument("--output", default="github_reviews.jsonl", help="Output JSON Lines file")
     
     args = parser.parse_args()
     
@@ -173,6 +381,15 @@ def main():
         logger.error("Invalid repository format. Use owner/repo")
         return
     
+    # Normalize the bounds once (e.g. 2024-1-5 -> 2024-01-05) so the per-item
+    # checks can stay plain string comparisons against GitHub's ISO timestamps
+    try:
+        start_date = datetime.strptime(args.start_date, "%Y-%m-%d").strftime("%Y-%m-%d")
+        end_date = datetime.strptime(args.end_date, "%Y-%m-%d").strftime("%Y-%m-%d")
+    except ValueError as e:
+        logger.error(f"Invalid date format. Use YYYY-MM-DD: {e}")
+        return
+    
     scraper = GitHubScraper(args.token)
     
     try:
@@ -182,31 +399,39 @@ def main():
         logger.info(f"Stars: {repo_info['stargazers_count']}")
         logger.info(f"Description: {repo_info['description']}")
         
-        # Get all types of feedback
-        all_reviews = []
-        
-        # Get issues
-        logger.info("Fetching issues...")
-        issues = scraper.get_issues(owner, repo, args.start_date, args.end_date)
-        all_reviews.extend(issues)
-        logger.info(f"Found {len(issues)} issues")
+        # Fetch each type of feedback concurrently, streaming records to disk as JSON Lines
+        lock = threading.Lock()
+        sample = None
         
-        # Get PR comments
-        logger.info("Fetching PR comments...")
-        comments = scraper.get_pr_comments(owner, repo, args.start_date, args.end_date)
-        all_reviews.extend(comments)
-        logger.info(f"Found {len(comments)} PR comments")
+        def save(f, label: str, reviews: Iterator[GitHubReview]) -> int:
+            nonlocal sample
+            logger.info(f"Fetching {label}...")
+            count = 0
+            for review in reviews:
+                line = _dumps_line(review)
+                with lock:
+                    f.write(line)
+                    sample = sample or review
+                count += 1
+            logger.info(f"Found {count} {label}")
+            return count
         
-        # Save results
-        with open(args.output, 'w', encoding='utf-8') as f:
-            json.dump([review.__dict__ for review in all_reviews], f, indent=2)
+        with open(args.output, 'wb') as f, ThreadPoolExecutor(max_workers=3) as executor:
+            futures = [
+                executor.submit(save, f, label, reviews)
+                for label, reviews in (
+                    ("issues", scraper.get_issues(owner, repo, start_date, end_date)),
+                    ("discussions", scraper.get_discussions(owner, repo, start_date, end_date)),
+                    ("PR comments", scraper.get_pr_comments(owner, repo, start_date, end_date)),
+                )
+            ]
+            total = sum(future.result() for future in futures)
         
-        logger.info(f"Saved {len(all_reviews)} reviews to {args.output}")
+        logger.info(f"Saved {total} reviews to {args.output}")
         
         # Print sample
-        if all_reviews:
+        if sample:
             print("\nSample review:")
-            sample = all_reviews[0]
             print(f"Title: {sample.title}")
             print(f"Type: {sample.type}")
             print(f"Author: {sample.author}")
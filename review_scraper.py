@@ -8,26 +8,37 @@ Author: Assistant
 Date: 2025-08-15
 """
 
-import requests
-from bs4 import BeautifulSoup
+from __future__ import annotations
+
 import json
 import time
+import os
+import hashlib
 import argparse
 from datetime import datetime, timedelta
 from urllib.parse import urljoin, quote_plus, urlparse
 import re
-from typing import List, Dict, Optional, Tuple
+from typing import TYPE_CHECKING, Callable, List, Dict, Optional, Tuple
 import logging
-from dataclasses import dataclass
+from dataclasses import dataclass, fields
+from operator import attrgetter
 from abc import ABC, abstractmethod
+from functools import lru_cache
 import random
 import ssl
-import urllib3
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
+import threading
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
-# Disable SSL warnings for older sites
-urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+# requests, urllib3 and bs4 are imported where first needed, so --mock runs never load them
+if TYPE_CHECKING:
+    import requests
+    from bs4 import BeautifulSoup
 
 # Configure logging
 logging.basicConfig(
@@ -36,7 +47,110 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-@dataclass
+# Patterns compiled once at import instead of going through re's cache per call
+_DATE_CLEAN_RE = re.compile(r'[^\w\s,/-]')
+_YEAR_RE = re.compile(r'\b(20\d{2})\b')
+_SLUG_RE = re.compile(r'[^a-z0-9-]')
+_REVIEW_RE = re.compile(r'review', re.I)
+_REVIEWS_H1_RE = re.compile(r'reviews?', re.I)
+_RATING_NUM_RE = re.compile(r'(\d+(?:\.\d+)?)')
+
+class LazySelector:
+    """CSS selector compiled on first use, so soupsieve (and bs4) load only when scraping"""
+    
+    def __init__(self, pattern: str):
+        self.pattern = pattern
+    
+    def __getattr__(self, name: str):
+        if name.startswith('__'):
+            raise AttributeError(name)
+        import soupsieve as sv
+        
+        # Cache the compiled selector's bound method on the instance, so only the
+        # first lookup of each method comes through here
+        value = getattr(sv.compile(self.pattern), name)
+        setattr(self, name, value)
+        return value
+
+# Review blocks on Capterra/TrustRadius; a compiled selector instead of a regex run per class
+_REVIEW_DIV_SELECTOR = LazySelector('div[class*="review"]')
+
+_DATE_FORMATS = (
+    "%B %d, %Y",
+    "%b %d, %Y",
+    "%m/%d/%Y",
+    "%Y-%m-%d",
+    "%d/%m/%Y",
+    "%B %Y",
+    "%b %Y",
+    "%Y-%m"
+)
+
+# Common date shapes and the only formats (in _DATE_FORMATS order) that can parse them
+_DATE_SHAPES = (
+    (re.compile(r'\d{4}-\d{1,2}-\d{1,2}$'), ("%Y-%m-%d",)),
+    (re.compile(r'\d{1,2}/\d{1,2}/\d{4}$'), ("%m/%d/%Y", "%d/%m/%Y")),
+    (re.compile(r'[A-Za-z]+ \d{1,2}, \d{4}$'), ("%B %d, %Y", "%b %d, %Y")),
+    (re.compile(r'[A-Za-z]+ \d{4}$'), ("%B %Y", "%b %Y")),
+    (re.compile(r'\d{4}-\d{1,2}$'), ("%Y-%m",)),
+)
+
+# Largest page body make_request will download and parse
+MAX_PAGE_BYTES = 10 * 1024 * 1024
+
+# Page bodies and their ETags are kept here so reruns can revalidate instead of re-downloading
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "review_scraper")
+# Cached pages older than this are dropped so the cache can't grow forever
+CACHE_MAX_AGE = timedelta(days=7)
+
+# Shared pool for fetching candidate URLs (product pages, pagination variants) concurrently
+_PROBE_POOL = ThreadPoolExecutor(max_workers=4)
+
+def _make_soup(markup: bytes) -> BeautifulSoup:
+    """Parse HTML with the C-backed lxml parser, falling back to html.parser"""
+    from bs4 import BeautifulSoup, FeatureNotFound
+    
+    try:
+        return BeautifulSoup(markup, 'lxml')
+    except FeatureNotFound:
+        return BeautifulSoup(markup, 'html.parser')
+
+def _text(elem) -> str:
+    """Stripped text of an element"""
+    return elem.get_text(strip=True)
+
+class SelectorChain:
+    """Precompiled CSS selectors tried in priority order"""
+    
+    def __init__(self, *patterns: str):
+        self.patterns = patterns
+        self.selectors = [LazySelector(pattern) for pattern in patterns]
+    
+    def find(self, root, extract: Callable,
+             skip: Optional[LazySelector] = None) -> Tuple[Optional[object], Optional[LazySelector]]:
+        """Return the first truthy extract() of each selector's first match, in priority
+        order, together with the selector that produced it; `skip` is left out"""
+        # Per-selector select_one stops at the first match, which beats one
+        # union walk re-checking every selector in Python on real markup
+        for selector in self.selectors:
+            if selector is skip:
+                continue
+            elem = selector.select_one(root)
+            if elem is not None:
+                value = extract(elem)
+                if value:
+                    return value, selector
+        return None, None
+    
+    def select(self, root) -> Tuple[Optional[str], List]:
+        """Return the highest-priority selector that matches anything, with all its matches"""
+        for pattern, selector in zip(self.patterns, self.selectors):
+            matches = selector.select(root)
+            if matches:
+                return pattern, matches
+        return None, []
+
+@dataclass(slots=True)
 class Review:
     """Data class to represent a review"""
     title: str
@@ -51,11 +165,60 @@ class Review:
     pros: Optional[str] = None
     cons: Optional[str] = None
 
+# Field names and a C-level getter for flattening reviews into output dicts
+_REVIEW_FIELDS = tuple(field.name for field in fields(Review))
+_review_values = attrgetter(*_REVIEW_FIELDS)
+
+class RateLimiter:
+    """Per-host sliding-window rate limiter with random jitter between requests"""
+    
+    def __init__(self, max_calls: int = 1, period: float = 2.0, jitter: float = 3.0):
+        self.max_calls = max_calls
+        self.period = period
+        self.jitter = jitter
+        self._calls: Dict[str, deque] = defaultdict(deque)
+        self._lock = threading.Lock()
+        self._rand = random.Random()
+    
+    def acquire(self, host: str, cancel: Optional[threading.Event] = None) -> bool:
+        """Block until a request to host is allowed, then record it
+        
+        Returns False without using a slot if `cancel` is set while waiting.
+        """
+        while True:
+            with self._lock:
+                if cancel is not None and cancel.is_set():
+                    return False
+                now = time.monotonic()
+                calls = self._calls[host]
+                while calls and now - calls[0] >= self.period:
+                    calls.popleft()
+                if len(calls) < self.max_calls:
+                    # Reserve a slot up to `jitter` seconds out so spacing isn't regular
+                    slot = now + self._rand.uniform(0, self.jitter)
+                    calls.append(slot)
+                    break
+                wait = calls[0] + self.period - now
+            time.sleep(wait)
+        time.sleep(slot - now)
+        
+        if cancel is not None and cancel.is_set():
+            # Give the slot back so the requests still wanted aren't delayed by it
+            with self._lock:
+                calls = self._calls[host]
+                if slot in calls:
+                    calls.remove(slot)
+            return False
+        return True
+
 class EnhancedSession:
     """Enhanced requests session with better anti-bot evasion"""
     
-    def __init__(self):
-        self.session = requests.Session()
+    def __init__(self, limiter: Optional[RateLimiter] = None, cache_dir: Optional[str] = CACHE_DIR):
+        self._session = None
+        self._session_lock = threading.Lock()
+        # Own generator instead of the module-level one shared with every other caller
+        self._rand = random.Random()
         
         # Rotate user agents
         self.user_agents = [
@@ -65,21 +228,10 @@ class EnhancedSession:
             'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.2 Safari/605.1.15'
         ]
         
-        # Set up session with retry strategy
-        retry_strategy = Retry(
-            total=3,
-            backoff_factor=1,
-            status_forcelist=[429, 500, 502, 503, 504],
-        )
-        adapter = HTTPAdapter(max_retries=retry_strategy)
-        self.session.mount("http://", adapter)
-        self.session.mount("https://", adapter)
-        
         # Common headers
         self.base_headers = {
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
             'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate, br',
             'Connection': 'keep-alive',
             'Upgrade-Insecure-Requests': '1',
             'Sec-Fetch-Dest': 'document',
@@ -87,33 +239,181 @@ class EnhancedSession:
             'Sec-Fetch-Site': 'none',
             'Cache-Control': 'max-age=0'
         }
+        
+        # Hosts whose certificates failed verification; only these skip it
+        self.insecure_hosts = set()
+        
+        # Last URL fetched per host, sent as Referer so one site never sees another's URLs
+        self.last_urls: Dict[str, str] = {}
+        
+        # Per-host pacing so different hosts don't wait on each other
+        self.limiter = limiter or RateLimiter()
+        
+        # URL -> ETag of pages seen before (bodies live under cache_dir), revalidated with If-None-Match
+        self.cache_dir = cache_dir
+        self._etags: Dict[str, List] = self._load_etags() if cache_dir else {}
+        self._etag_lock = threading.Lock()
     
-    def get(self, url: str, **kwargs) -> requests.Response:
-        """Make GET request with rotation and evasion"""
+    @property
+    def session(self) -> requests.Session:
+        """The underlying requests session, built on first use"""
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    self._session = self._build_session()
+        return self._session
+    
+    @session.setter
+    def session(self, session: requests.Session):
+        self._session = session
+    
+    @staticmethod
+    def _build_session() -> requests.Session:
+        """Create a requests session with retries and a keep-alive pool"""
+        import requests
+        import urllib3
+        from requests.adapters import HTTPAdapter
+        from urllib3.util import make_headers
+        from urllib3.util.retry import Retry
+        
+        # Disable SSL warnings for older sites
+        urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+        
+        session = requests.Session()
+        # Advertise only encodings urllib3 can decode here (br/zstd when brotli/zstandard are installed)
+        session.headers.update(make_headers(accept_encoding=True))
+        
+        # Set up session with retry strategy
+        retry_strategy = Retry(
+            total=3,
+            backoff_factor=1,
+            status_forcelist=[429, 500, 502, 503, 504],
+        )
+        # Keep-alive pool so pagination on one host reuses the TLS connection
+        adapter = HTTPAdapter(
+            max_retries=retry_strategy,
+            pool_connections=4,
+            pool_maxsize=16,
+            pool_block=False,
+        )
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+    
+    def _load_etags(self) -> Dict[str, List]:
+        """Load persisted [ETag, stored-at] pairs, expiring entries and bodies past CACHE_MAX_AGE"""
+        cutoff = time.time() - CACHE_MAX_AGE.total_seconds()
+        try:
+            with open(os.path.join(self.cache_dir, "etags.json"), 'rb') as f:
+                etags = json.loads(f.read())
+        except (OSError, ValueError):
+            etags = {}
+        
+        bodies = os.path.join(self.cache_dir, "bodies")
+        try:
+            for entry in os.scandir(bodies):
+                if entry.stat().st_mtime < cutoff:
+                    os.remove(entry.path)
+        except OSError:
+            pass
+        return {key: value for key, value in etags.items()
+                if isinstance(value, list) and value[1] >= cutoff}
+    
+    def _body_path(self, key: str) -> str:
+        """Path of the cached page body for a URL"""
+        digest = hashlib.sha1(key.encode()).hexdigest()
+        return os.path.join(self.cache_dir, "bodies", f"{digest}.html")
+    
+    def cached_etag(self, key: str) -> Optional[str]:
+        """ETag stored for a URL, if its body is cached"""
+        entry = self._etags.get(key)
+        return entry[0] if entry else None
+    
+    def cached_body(self, key: str) -> Optional[bytes]:
+        """Cached body for a URL, or None if it went missing"""
+        try:
+            with open(self._body_path(key), 'rb') as f:
+                return f.read()
+        except OSError:
+            return None
+    
+    def store(self, key: str, etag: str, body: bytes):
+        """Persist a page body and its ETag"""
+        if not self.cache_dir:
+            return
+        try:
+            path = self._body_path(key)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'wb') as f:
+                f.write(body)
+            with self._etag_lock:
+                self._etags[key] = [etag, time.time()]
+                with open(os.path.join(self.cache_dir, "etags.json"), 'w', encoding='utf-8') as f:
+                    json.dump(self._etags, f)
+        except OSError as e:
+            logger.warning(f"Could not write page cache: {e}")
+    
+    def request(self, method: str, url: str, delay: bool = True,
+                cancel: Optional[threading.Event] = None, **kwargs) -> Optional[requests.Response]:
+        """Make request with rotation and evasion (None if `cancel` was set before it was sent)"""
+        import requests
+        
         headers = self.base_headers.copy()
-        headers['User-Agent'] = random.choice(self.user_agents)
+        headers['User-Agent'] = self._rand.choice(self.user_agents)
         
-        # Add referer for subsequent requests
-        if hasattr(self, 'last_url'):
-            headers['Referer'] = self.last_url
+        # Add referer for subsequent requests to the same site
+        host = urlparse(url).netloc
+        if host in self.last_urls:
+            headers['Referer'] = self.last_urls[host]
         
         kwargs.setdefault('headers', {}).update(headers)
         kwargs.setdefault('timeout', 30)
-        kwargs.setdefault('verify', False)  # Some sites have SSL issues
         
-        # Random delay
-        time.sleep(random.uniform(2, 5))
+        if host in self.insecure_hosts:
+            kwargs['verify'] = False
         
-        response = self.session.get(url, **kwargs)
-        self.last_url = url
+        # Random per-host delay; a cancelled request is dropped before it is sent
+        if delay and not self.limiter.acquire(host, cancel):
+            return None
+        
+        try:
+            response = self.session.request(method, url, **kwargs)
+        except requests.exceptions.SSLError as e:
+            # Some sites have SSL issues; retry this host without verification
+            logger.warning(f"SSL verification failed for {host}, retrying without it: {e}")
+            self.insecure_hosts.add(host)
+            kwargs['verify'] = False
+            response = self.session.request(method, url, **kwargs)
+        self.last_urls[host] = url
         
         return response
+    
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """Make GET request with rotation and evasion"""
+        return self.request('GET', url, **kwargs)
+    
+    def head(self, url: str, **kwargs) -> Optional[requests.Response]:
+        """Make HEAD request (following redirects) to check a URL without its body"""
+        kwargs.setdefault('allow_redirects', True)
+        return self.request('HEAD', url, **kwargs)
+
+_shared_session: Optional[EnhancedSession] = None
+
+def _default_session() -> EnhancedSession:
+    """Return the session shared by scrapers created without one"""
+    global _shared_session
+    if _shared_session is None:
+        _shared_session = EnhancedSession()
+    return _shared_session
 
 class ReviewScraper(ABC):
     """Abstract base class for review scrapers"""
     
-    def __init__(self):
-        self.session = EnhancedSession()
+    def __init__(self, session: Optional[EnhancedSession] = None):
+        # Scrapers share one session so connection pools, cookies and rate limits are common
+        self.session = session or _default_session()
+        # Product page parsed while validating it in get_direct_url, reused by scrape_reviews
+        self._validated_page: Tuple[Optional[str], Optional[BeautifulSoup]] = (None, None)
         self.reviews = []
         self.rate_limit_delay = 3  # seconds between requests
     
@@ -127,43 +427,116 @@ class ReviewScraper(ABC):
         """Scrape reviews from product page"""
         pass
     
-    def make_request(self, url: str, params: Dict = None) -> Optional[BeautifulSoup]:
+    def make_request(self, url: str, params: Dict = None, delay: bool = True,
+                     revalidate: bool = True) -> Optional[BeautifulSoup]:
         """Make HTTP request with error handling and rate limiting"""
+        import requests
+        
+        key = requests.Request('GET', url, params=params).prepare().url
+        etag = self.session.cached_etag(key) if revalidate else None
+        kwargs = {'headers': {'If-None-Match': etag}} if etag else {}
         try:
-            response = self.session.get(url, params=params)
-            response.raise_for_status()
-            return BeautifulSoup(response.content, 'html.parser')
+            with self.session.get(url, params=params, delay=delay, stream=True, **kwargs) as response:
+                # Unchanged since the last fetch: reuse the cached body instead of downloading it again
+                if etag and response.status_code == 304:
+                    body = self.session.cached_body(key)
+                    if body is None:
+                        # Body went missing; fetch the page again unconditionally
+                        return self.make_request(url, params, delay, revalidate=False)
+                    return _make_soup(body)
+                response.raise_for_status()
+                
+                # Stream the body so oversized pages are dropped before they are held in memory
+                if int(response.headers.get('Content-Length') or 0) > MAX_PAGE_BYTES:
+                    logger.warning(f"Skipping {url}: page exceeds {MAX_PAGE_BYTES} bytes")
+                    return None
+                chunks = []
+                size = 0
+                for chunk in response.iter_content(chunk_size=65536):
+                    size += len(chunk)
+                    if size > MAX_PAGE_BYTES:
+                        logger.warning(f"Skipping {url}: page exceeds {MAX_PAGE_BYTES} bytes")
+                        return None
+                    chunks.append(chunk)
+                body = b''.join(chunks)
+                if response.headers.get('ETag'):
+                    self.session.store(key, response.headers['ETag'], body)
+            return _make_soup(body)
         except requests.RequestException as e:
             logger.error(f"Request failed for {url}: {e}")
             return None
     
-    def parse_date(self, date_str: str) -> Optional[datetime]:
+    def _find_valid_url(self, urls: List[str], source: str,
+                        is_valid: Callable[[BeautifulSoup], bool]) -> Optional[str]:
+        """Return the first candidate URL that exists and passes is_valid"""
+        import requests
+        
+        # Candidate patterns can collapse to the same URL (e.g. one-word names)
+        urls = list(dict.fromkeys(urls))
+        
+        # HEAD all candidates concurrently so missing pages are ruled out
+        # without downloading/parsing them; once one validates, probes still
+        # waiting on the rate limiter are dropped instead of sent
+        for url in urls:
+            logger.info(f"Trying {source} URL: {url}")
+        found = threading.Event()
+        probes = [_PROBE_POOL.submit(self.session.head, url, cancel=found) for url in urls]
+        
+        # Check results in candidate order so the preferred URL still wins
+        for url, probe in zip(urls, probes):
+            try:
+                status = probe.result().status_code
+            except requests.RequestException as e:
+                logger.error(f"Request failed for {url}: {e}")
+                continue
+            # 405/501: the server doesn't support HEAD, so fall back to the GET
+            if status not in (200, 405, 501):
+                logger.info(f"Skipping {url} (HTTP {status})")
+                continue
+            
+            soup = self.make_request(url, delay=False)
+            if soup and is_valid(soup):
+                logger.info(f"Found valid {source} page: {url}")
+                self._validated_page = (url, soup)
+                found.set()
+                for pending in probes:
+                    pending.cancel()
+                return url
+        
+        return None
+    
+    def _take_validated_page(self, url: str) -> Optional[BeautifulSoup]:
+        """Hand over the page get_direct_url parsed for url, releasing it either way"""
+        validated_url, soup = self._validated_page
+        self._validated_page = (None, None)
+        return soup if validated_url == url else None
+    
+    def _get_product_page(self, url: str) -> Optional[BeautifulSoup]:
+        """Fetch a product page, reusing the copy already parsed by get_direct_url"""
+        return self._take_validated_page(url) or self.make_request(url)
+    
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def parse_date(date_str: str) -> Optional[datetime]:
         """Parse date string to datetime object"""
         if not date_str:
             return None
             
         # Clean the date string
-        date_str = re.sub(r'[^\w\s,/-]', '', date_str.strip())
-        
-        date_formats = [
-            "%B %d, %Y",
-            "%b %d, %Y", 
-            "%m/%d/%Y",
-            "%Y-%m-%d",
-            "%d/%m/%Y",
-            "%B %Y",
-            "%b %Y",
-            "%Y-%m"
-        ]
+        date_str = _DATE_CLEAN_RE.sub('', date_str.strip())
         
-        for fmt in date_formats:
+        # Only the formats matching the string's shape can parse it, so common
+        # dates don't pay for a ValueError from every other format; unknown
+        # shapes still try them all
+        formats = next((formats for shape, formats in _DATE_SHAPES if shape.match(date_str)), _DATE_FORMATS)
+        for fmt in formats:
             try:
                 return datetime.strptime(date_str, fmt)
             except ValueError:
                 continue
         
         # Try to extract year at least
-        year_match = re.search(r'\b(20\d{2})\b', date_str)
+        year_match = _YEAR_RE.search(date_str)
         if year_match:
             try:
                 return datetime(int(year_match.group(1)), 1, 1)
@@ -178,11 +551,61 @@ class G2Scraper(ReviewScraper):
     
     BASE_URL = "https://www.g2.com"
     
+    # CSS selectors compiled once at import rather than on every select() call
+    CONTAINER_SELECTORS = SelectorChain(
+        'div[data-testid*="review"]',
+        'div[class*="review"]',
+        'article[class*="review"]',
+        'section[class*="review"]',
+        '.paper--white-paper',
+        '[data-qa="review"]'
+    )
+    TITLE_SELECTORS = SelectorChain('h3', 'h4', '[data-qa="review-title"]', '.review-title', 'strong')
+    TEXT_SELECTORS = SelectorChain(
+        '[data-qa="review-text"]',
+        '.review-text',
+        'div[class*="description"]',
+        'p',
+        'div[class*="content"]'
+    )
+    DATE_SELECTORS = SelectorChain('time', '[data-qa="review-date"]', '.review-date', 'span[class*="date"]')
+    RATING_SELECTORS = SelectorChain('.stars', '[class*="rating"]', '[class*="star"]')
+    FILLED_STAR_SELECTOR = LazySelector('.star-filled, [class*="filled"]')
+    PRODUCT_PAGE_SELECTOR = LazySelector(
+        'div[class*="review" i], h1, div[data-testid*="review" i], section[class*="review" i]'
+    )
+    REVIEWER_SELECTORS = SelectorChain('.reviewer-name', '[class*="author"]', '[class*="reviewer"]')
+    
+    def __init__(self, session: Optional[EnhancedSession] = None):
+        super().__init__(session)
+        self._reset_learned()
+    
+    def _reset_learned(self):
+        """Forget the selectors learned from the previous product's layout"""
+        self._learned = {'title': None, 'text': None, 'date': None, 'rating': None, 'reviewer': None}
+    
+    def _select_field(self, field: str, chain: SelectorChain, container, extract: Callable):
+        """Extract a field with the selector that worked on earlier reviews, else the full chain"""
+        # Reviews of one product share a layout, so the winning selector usually matches
+        learned = self._learned[field]
+        if learned is not None:
+            elem = learned.select_one(container)
+            if elem is not None:
+                value = extract(elem)
+                if value:
+                    return value
+        
+        # Keep the first review's winner; an odd review shouldn't retrain the rest
+        value, selector = chain.find(container, extract, skip=learned)
+        if learned is None:
+            self._learned[field] = selector
+        return value
+    
     def get_direct_url(self, company_name: str) -> Optional[str]:
         """Try to construct direct G2 URL based on common patterns"""
         # Common G2 URL patterns
         company_slug = company_name.lower().replace(' ', '-').replace('_', '-')
-        company_slug = re.sub(r'[^a-z0-9-]', '', company_slug)
+        company_slug = _SLUG_RE.sub('', company_slug)
         
         possible_urls = [
             f"{self.BASE_URL}/products/{company_slug}/reviews",
@@ -191,12 +614,9 @@ class G2Scraper(ReviewScraper):
         ]
         
         # Try each possible URL
-        for url in possible_urls:
-            logger.info(f"Trying G2 URL: {url}")
-            soup = self.make_request(url)
-            if soup and self._is_valid_product_page(soup):
-                logger.info(f"Found valid G2 page: {url}")
-                return url
+        url = self._find_valid_url(possible_urls, "G2", self._is_valid_product_page)
+        if url:
+            return url
                 
         # If direct URLs fail, try a different approach - manual URL construction
         # This would require knowing specific product URLs beforehand
@@ -210,21 +630,21 @@ class G2Scraper(ReviewScraper):
         if not soup:
             return False
         
-        # Look for indicators of a product page
-        indicators = [
-            soup.find('div', class_=re.compile(r'review', re.I)),
-            soup.find('h1', string=re.compile(r'reviews?', re.I)),
-            soup.find('div', {'data-testid': re.compile(r'review', re.I)}),
-            soup.find('section', class_=re.compile(r'review', re.I))
-        ]
+        # Look for indicators of a product page in a single walk; h1 text
+        # can't be matched case-insensitively in CSS, so check it here
+        for elem in self.PRODUCT_PAGE_SELECTOR.iselect(soup):
+            if elem.name != 'h1' or (elem.string and _REVIEWS_H1_RE.search(elem.string)):
+                return True
         
-        return any(indicators)
+        return False
     
     def scrape_reviews(self, product_url: str, start_date: datetime, end_date: datetime) -> List[Review]:
         """Scrape reviews from G2 product page"""
         reviews = []
         page = 1
         max_pages = 10  # Limit to prevent infinite loops
+        variant = None  # Index of the pagination pattern this product responds to
+        self._reset_learned()
         
         while page <= max_pages:
             # G2 pagination patterns
@@ -234,11 +654,20 @@ class G2Scraper(ReviewScraper):
                 f"{product_url.replace('/reviews', '')}?page={page}"
             ]
             
-            soup = None
-            for page_url in page_urls:
-                soup = self.make_request(page_url)
-                if soup and self._has_reviews(soup):
-                    break
+            if variant is not None:
+                # The pattern that worked on the first page is the only one worth fetching
+                soup = self.make_request(page_urls[variant])
+            else:
+                # Page 1 is usually the product page get_direct_url already parsed
+                soup = self._take_validated_page(product_url) if page == 1 else None
+                if not (soup and self._has_reviews(soup)):
+                    # Try the variants in order; they share a host, so the rate limiter
+                    # would serialize concurrent fetches anyway
+                    for i, url in enumerate(page_urls):
+                        soup = self.make_request(url)
+                        if soup and self._has_reviews(soup):
+                            variant = i
+                            break
             
             if not soup:
                 logger.info(f"No more pages found at page {page}")
@@ -278,86 +707,41 @@ class G2Scraper(ReviewScraper):
     
     def _find_review_containers(self, soup: BeautifulSoup) -> List:
         """Find review containers using multiple selectors"""
-        selectors = [
-            'div[data-testid*="review"]',
-            'div[class*="review"]',
-            'article[class*="review"]',
-            'section[class*="review"]',
-            '.paper--white-paper',
-            '[data-qa="review"]'
-        ]
-        
-        for selector in selectors:
-            containers = soup.select(selector)
-            if containers:
-                logger.debug(f"Found {len(containers)} containers with selector: {selector}")
-                return containers
-        
-        return []
+        pattern, containers = self.CONTAINER_SELECTORS.select(soup)
+        if containers:
+            logger.debug(f"Found {len(containers)} containers with selector: {pattern}")
+        return containers
     
     def _parse_g2_review(self, container: BeautifulSoup) -> Optional[Review]:
         """Parse individual G2 review"""
         try:
             # Extract title - try multiple selectors
-            title_selectors = ['h3', 'h4', '[data-qa="review-title"]', '.review-title', 'strong']
-            title = "No title"
-            for selector in title_selectors:
-                title_elem = container.select_one(selector)
-                if title_elem and title_elem.get_text(strip=True):
-                    title = title_elem.get_text(strip=True)
-                    break
+            title = self._select_field('title', self.TITLE_SELECTORS, container, _text) or "No title"
             
             # Extract review text
-            text_selectors = [
-                '[data-qa="review-text"]',
-                '.review-text',
-                'div[class*="description"]',
-                'p',
-                'div[class*="content"]'
-            ]
-            description = "No description"
-            for selector in text_selectors:
-                text_elem = container.select_one(selector)
-                if text_elem and text_elem.get_text(strip=True):
-                    description = text_elem.get_text(strip=True)
-                    break
+            description = self._select_field('text', self.TEXT_SELECTORS, container, _text) or "No description"
             
             # Extract date
-            date_selectors = ['time', '[data-qa="review-date"]', '.review-date', 'span[class*="date"]']
-            date = datetime.now().strftime("%B %d, %Y")
-            for selector in date_selectors:
-                date_elem = container.select_one(selector)
-                if date_elem:
-                    date_text = date_elem.get_text(strip=True) or date_elem.get('datetime', '')
-                    if date_text:
-                        date = date_text
-                        break
+            date = self._select_field(
+                'date', self.DATE_SELECTORS, container, lambda elem: elem.get_text(strip=True) or elem.get('datetime', '')
+            ) or datetime.now().strftime("%B %d, %Y")
             
             # Extract rating
             rating = None
-            rating_selectors = ['.stars', '[class*="rating"]', '[class*="star"]']
-            for selector in rating_selectors:
-                rating_elem = container.select_one(selector)
-                if rating_elem:
-                    # Look for filled stars or numeric rating
-                    filled_stars = rating_elem.select('.star-filled, [class*="filled"]')
-                    if filled_stars:
-                        rating = len(filled_stars)
-                    else:
-                        rating_text = rating_elem.get_text()
-                        rating_match = re.search(r'(\d+(?:\.\d+)?)', rating_text)
-                        if rating_match:
-                            rating = float(rating_match.group(1))
-                    break
+            rating_elem = self._select_field('rating', self.RATING_SELECTORS, container, lambda elem: elem)
+            if rating_elem:
+                # Look for filled stars or numeric rating
+                filled_stars = self.FILLED_STAR_SELECTOR.select(rating_elem)
+                if filled_stars:
+                    rating = len(filled_stars)
+                else:
+                    rating_text = rating_elem.get_text()
+                    rating_match = _RATING_NUM_RE.search(rating_text)
+                    if rating_match:
+                        rating = float(rating_match.group(1))
             
             # Extract reviewer name
-            reviewer_selectors = ['.reviewer-name', '[class*="author"]', '[class*="reviewer"]']
-            reviewer_name = "Anonymous"
-            for selector in reviewer_selectors:
-                reviewer_elem = container.select_one(selector)
-                if reviewer_elem and reviewer_elem.get_text(strip=True):
-                    reviewer_name = reviewer_elem.get_text(strip=True)
-                    break
+            reviewer_name = self._select_field('reviewer', self.REVIEWER_SELECTORS, container, _text) or "Anonymous"
             
             return Review(
                 title=title,
@@ -382,7 +766,7 @@ class CapterraScraper(ReviewScraper):
     def get_direct_url(self, company_name: str) -> Optional[str]:
         """Try to construct direct Capterra URL"""
         company_slug = company_name.lower().replace(' ', '-').replace('_', '-')
-        company_slug = re.sub(r'[^a-z0-9-]', '', company_slug)
+        company_slug = _SLUG_RE.sub('', company_slug)
         
         possible_urls = [
             f"{self.BASE_URL}/p/{company_slug}/reviews",
@@ -390,19 +774,16 @@ class CapterraScraper(ReviewScraper):
             f"{self.BASE_URL}/p/{company_name.lower().replace(' ', '-')}/reviews"
         ]
         
-        for url in possible_urls:
-            logger.info(f"Trying Capterra URL: {url}")
-            soup = self.make_request(url)
-            if soup and self._is_valid_capterra_page(soup):
-                logger.info(f"Found valid Capterra page: {url}")
-                return url
+        url = self._find_valid_url(possible_urls, "Capterra", self._is_valid_capterra_page)
+        if url:
+            return url
         
         logger.warning(f"Could not find direct Capterra URL for {company_name}")
         return None
     
     def _is_valid_capterra_page(self, soup: BeautifulSoup) -> bool:
         """Check if page is valid Capterra product page"""
-        return soup and bool(soup.find(string=re.compile(r'review', re.I)))
+        return soup and bool(soup.find(string=_REVIEW_RE))
     
     def scrape_reviews(self, product_url: str, start_date: datetime, end_date: datetime) -> List[Review]:
         """Scrape reviews from Capterra"""
@@ -410,12 +791,12 @@ class CapterraScraper(ReviewScraper):
         reviews = []
         
         # Capterra often loads reviews dynamically, so this is a simplified version
-        soup = self.make_request(product_url)
+        soup = self._get_product_page(product_url)
         if not soup:
             return reviews
         
         # Look for review elements
-        review_elements = soup.find_all('div', class_=re.compile(r'review'))
+        review_elements = _REVIEW_DIV_SELECTOR.select(soup)
         
         for element in review_elements:
             review = self._parse_capterra_review(element)
@@ -457,19 +838,17 @@ class TrustRadiusScraper(ReviewScraper):
     def get_direct_url(self, company_name: str) -> Optional[str]:
         """Try to construct direct TrustRadius URL"""
         company_slug = company_name.lower().replace(' ', '-')
-        company_slug = re.sub(r'[^a-z0-9-]', '', company_slug)
+        company_slug = _SLUG_RE.sub('', company_slug)
         
         possible_urls = [
             f"{self.BASE_URL}/products/{company_slug}/reviews",
             f"{self.BASE_URL}/products/{company_slug}"
         ]
         
-        for url in possible_urls:
-            logger.info(f"Trying TrustRadius URL: {url}")
-            soup = self.make_request(url)
-            if soup and soup.find(string=re.compile(r'review', re.I)):
-                logger.info(f"Found valid TrustRadius page: {url}")
-                return url
+        url = self._find_valid_url(possible_urls, "TrustRadius",
+                                   lambda soup: bool(soup.find(string=_REVIEW_RE)))
+        if url:
+            return url
         
         logger.warning(f"Could not find TrustRadius URL for {company_name}")
         return None
@@ -477,11 +856,11 @@ class TrustRadiusScraper(ReviewScraper):
     def scrape_reviews(self, product_url: str, start_date: datetime, end_date: datetime) -> List[Review]:
         """Scrape reviews from TrustRadius"""
         reviews = []
-        soup = self.make_request(product_url)
+        soup = self._get_product_page(product_url)
         
         if soup:
             # Simplified TrustRadius parsing
-            review_elements = soup.find_all('div', class_=re.compile(r'review'))
+            review_elements = _REVIEW_DIV_SELECTOR.select(soup)
             
             for element in review_elements[:5]:  # Limit for demo
                 review = Review(
@@ -502,32 +881,35 @@ class TrustRadiusScraper(ReviewScraper):
         logger.info(f"Scraped {len(reviews)} reviews from TrustRadius")
         return reviews
 
+# Mock review templates, built once at import; {company} is filled in per call
+_MOCK_TITLES = (
+    "Excellent {company} experience",
+    "Great tool for our team - {company} rocks!",
+    "Mixed feelings about {company}",
+    "{company} has transformed our workflow",
+    "Good product but could be better - {company} review"
+)
+_MOCK_DESCRIPTIONS = (
+    "We've been using {company} for over a year and it has significantly improved our productivity. The interface is intuitive and the features are comprehensive.",
+    "Great experience with {company}. Customer support is responsive and the product delivers on its promises. Highly recommended for teams of our size.",
+    "While {company} has good features, we found some limitations in customization. Overall decent but not perfect for our use case.",
+    "{company} integrates well with our existing tools. The learning curve was manageable and our team adapted quickly.",
+    "Mixed experience with {company}. Some features are excellent while others need improvement. Would consider alternatives."
+)
+
 class MockDataGenerator:
     """Generate mock data when scraping fails"""
     
     @staticmethod
     def generate_mock_reviews(company_name: str, source: str, count: int = 5) -> List[Review]:
         """Generate realistic mock reviews"""
-        reviews = []
-        
-        sample_titles = [
-            f"Excellent {company_name} experience",
-            f"Great tool for our team - {company_name} rocks!",
-            f"Mixed feelings about {company_name}",
-            f"{company_name} has transformed our workflow",
-            f"Good product but could be better - {company_name} review"
-        ]
-        
-        sample_descriptions = [
-            f"We've been using {company_name} for over a year and it has significantly improved our productivity. The interface is intuitive and the features are comprehensive.",
-            f"Great experience with {company_name}. Customer support is responsive and the product delivers on its promises. Highly recommended for teams of our size.",
-            f"While {company_name} has good features, we found some limitations in customization. Overall decent but not perfect for our use case.",
-            f"{company_name} integrates well with our existing tools. The learning curve was manageable and our team adapted quickly.",
-            f"Mixed experience with {company_name}. Some features are excellent while others need improvement. Would consider alternatives."
-        ]
+        sample_titles = [title.format(company=company_name) for title in _MOCK_TITLES]
+        sample_descriptions = [text.format(company=company_name) for text in _MOCK_DESCRIPTIONS]
+        pros = "Good integration, Easy to use" if source == "TrustRadius" else None
+        cons = "Could be cheaper, Limited customization" if source == "TrustRadius" else None
         
-        for i in range(count):
-            review = Review(
+        return [
+            Review(
                 title=sample_titles[i % len(sample_titles)],
                 description=sample_descriptions[i % len(sample_descriptions)],
                 date=f"August {10+i}, 2024",
@@ -537,27 +919,27 @@ class MockDataGenerator:
                 company_size="51-200 employees" if i % 3 == 0 else "11-50 employees",
                 source=source,
                 verified=i % 2 == 0,
-                pros="Good integration, Easy to use" if source == "TrustRadius" else None,
-                cons="Could be cheaper, Limited customization" if source == "TrustRadius" else None
+                pros=pros,
+                cons=cons
             )
-            reviews.append(review)
-        
-        return reviews
+            for i in range(count)
+        ]
 
 class ReviewScrapingTool:
     """Main tool for scraping reviews from multiple sources"""
     
     def __init__(self):
+        self.session = EnhancedSession()
         self.scrapers = {
-            'g2': G2Scraper(),
-            'capterra': CapterraScraper(),
-            'trustradius': TrustRadiusScraper()
+            'g2': G2Scraper(self.session),
+            'capterra': CapterraScraper(self.session),
+            'trustradius': TrustRadiusScraper(self.session)
         }
         self.mock_generator = MockDataGenerator()
     
-    def scrape_reviews(self, company_name: str, start_date: str, end_date: str, source: str, 
-                      use_mock: bool = False) -> List[Dict]:
-        """Main method to scrape reviews"""
+    def scrape_reviews(self, company_name: str, start_date: str, end_date: str,
+                      source: Optional[str] = None, use_mock: bool = False) -> List[Dict]:
+        """Main method to scrape reviews (from every source when none is given)"""
         # Parse dates
         try:
             start_dt = datetime.strptime(start_date, "%Y-%m-%d")
@@ -566,62 +948,66 @@ class ReviewScrapingTool:
             logger.error(f"Invalid date format. Use YYYY-MM-DD: {e}")
             return []
         
-        # Validate source
-        source_lower = source.lower()
-        if source_lower not in self.scrapers:
-            logger.error(f"Unsupported source: {source}. Available sources: {list(self.scrapers.keys())}")
-            return []
+        if source is None:
+            # Scrape all sources concurrently; each host is rate-limited independently
+            with ThreadPoolExecutor(max_workers=len(self.scrapers)) as executor:
+                results = executor.map(
+                    lambda name: self._scrape_source(company_name, start_dt, end_dt, name, use_mock),
+                    self.scrapers
+                )
+                reviews = [review for source_reviews in results for review in source_reviews]
+            source = "all sources"
+        else:
+            # Validate source
+            if source.lower() not in self.scrapers:
+                logger.error(f"Unsupported source: {source}. Available sources: {list(self.scrapers.keys())}")
+                return []
+            reviews = self._scrape_source(company_name, start_dt, end_dt, source, use_mock)
+        
+        logger.info(f"Successfully obtained {len(reviews)} reviews from {source}")
         
-        logger.info(f"Starting to scrape {source} reviews for {company_name} from {start_date} to {end_date}")
+        # Convert to dictionaries
+        return [dict(zip(_REVIEW_FIELDS, _review_values(review))) for review in reviews]
+    
+    def _scrape_source(self, company_name: str, start_dt: datetime, end_dt: datetime, source: str,
+                       use_mock: bool) -> List[Review]:
+        """Scrape one source, falling back to mock data"""
+        logger.info(f"Starting to scrape {source} reviews for {company_name} "
+                    f"from {start_dt:%Y-%m-%d} to {end_dt:%Y-%m-%d}")
         
         # If mock mode is enabled or scraping fails, use mock data
         if use_mock:
             logger.info("Using mock data mode")
-            reviews = self.mock_generator.generate_mock_reviews(company_name, source.upper())
-        else:
-            scraper = self.scrapers[source_lower]
-            
-            # Try to get direct URL
-            product_url = scraper.get_direct_url(company_name)
-            if not product_url:
-                logger.warning(f"Could not find {company_name} on {source}. Using mock data instead.")
-                reviews = self.mock_generator.generate_mock_reviews(company_name, source.upper())
-            else:
-                logger.info(f"Found product URL: {product_url}")
-                
-                # Scrape reviews
-                reviews = scraper.scrape_reviews(product_url, start_dt, end_dt)
-                
-                # If no reviews found, use mock data
-                if not reviews:
-                    logger.warning("No reviews found from scraping. Using mock data.")
-                    reviews = self.mock_generator.generate_mock_reviews(company_name, source.upper())
+            return self.mock_generator.generate_mock_reviews(company_name, source.upper())
         
-        logger.info(f"Successfully obtained {len(reviews)} reviews from {source}")
+        scraper = self.scrapers[source.lower()]
         
-        # Convert to dictionaries
-        return [
-            {
-                'title': review.title,
-                'description': review.description,
-                'date': review.date,
-                'rating': review.rating,
-                'reviewer_name': review.reviewer_name,
-                'reviewer_title': review.reviewer_title,
-                'company_size': review.company_size,
-                'source': review.source,
-                'verified': review.verified,
-                'pros': review.pros,
-                'cons': review.cons
-            }
-            for review in reviews
-        ]
+        # Try to get direct URL
+        product_url = scraper.get_direct_url(company_name)
+        if not product_url:
+            logger.warning(f"Could not find {company_name} on {source}. Using mock data instead.")
+            return self.mock_generator.generate_mock_reviews(company_name, source.upper())
+        
+        logger.info(f"Found product URL: {product_url}")
+        
+        # Scrape reviews
+        reviews = scraper.scrape_reviews(product_url, start_dt, end_dt)
+        
+        # If no reviews found, use mock data
+        if not reviews:
+            logger.warning("No reviews found from scraping. Using mock data.")
+            reviews = self.mock_generator.generate_mock_reviews(company_name, source.upper())
+        return reviews
     
     def save_to_json(self, reviews: List[Dict], filename: str):
         """Save reviews to JSON file"""
         try:
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(reviews, f, indent=2, ensure_ascii=False)
+            if orjson is not None:
+                with open(filename, 'wb') as f:
+                    f.write(orjson.dumps(reviews, option=orjson.OPT_INDENT_2))
+            else:
+                with open(filename, 'w', encoding='utf-8') as f:
+                    json.dump(reviews, f, indent=2, ensure_ascii=False)
             logger.info(f"Reviews saved to {filename}")
         except Exception as e:
             logger.error(f"Error saving to JSON: {e}")
@@ -632,8 +1018,8 @@ def main():
     parser.add_argument('--company', required=True, help='Company name to search for')
     parser.add_argument('--start-date', required=True, help='Start date (YYYY-MM-DD)')
     parser.add_argument('--end-date', required=True, help='End date (YYYY-MM-DD)')
-    parser.add_argument('--source', required=True, choices=['g2', 'capterra', 'trustradius'], 
-                       help='Review source')
+    parser.add_argument('--source', choices=['g2', 'capterra', 'trustradius'], 
+                       help='Review source (default: all sources, scraped concurrently)')
     parser.add_argument('--output', default='reviews.json', help='Output JSON filename')
     parser.add_argument('--mock', action='store_true', 
                        help='Use mock data instead of scraping (for demo purposes)')